@@ -0,0 +1,216 @@
+import hashlib
+import re
+import threading
+import time
+import zlib
+
+import numpy as np
+
+# Number of hashed feature buckets per question vector
+EMBEDDING_DIM = 4096
+
+# Cosine similarity above which a cached answer is reused
+SIMILARITY_THRESHOLD = 0.8
+
+# Upper bound on cached answers; the least recently used entry is evicted first
+MAX_ENTRIES = 512
+
+NUMBER_WORDS = {
+    "1": "1", "1st": "1", "first": "1", "one": "1",
+    "2": "2", "2nd": "2", "second": "2", "two": "2",
+    "3": "3", "3rd": "3", "third": "3", "three": "3",
+    "4": "4", "4th": "4", "fourth": "4", "four": "4", "final": "final",
+}
+NUMBER_PATTERN = "|".join(sorted(NUMBER_WORDS, key=len, reverse=True))
+
+# Paraphrases that mean the same thing for course questions
+SYNONYMS = {
+    "cybersecurity": "cyber", "security": "cyber", "cyber": "cyber",
+    "courses": "course", "course": "course", "subjects": "course", "subject": "course",
+    "units": "course", "unit": "course", "classes": "course", "class": "course",
+    "take": "course", "taking": "course", "study": "course", "studying": "course",
+    "do": "course", "choose": "course", "pick": "course", "recommend": "course",
+    "recommended": "course", "suggest": "course", "should": "course",
+    "enrol": "enrol", "enroll": "enrol", "enrolling": "enrol", "enrolment": "enrol", "enrollment": "enrol",
+}
+
+STOPWORDS = {
+    "a", "an", "the", "what", "which", "i", "im", "me", "my", "we", "for", "in", "of", "to",
+    "is", "are", "am", "be", "can", "could", "would", "please", "and", "or", "on", "at",
+    "you", "your", "students", "student", "s", "there", "any", "with", "about", "tell",
+}
+
+COURSE_CODE_PATTERN = re.compile(r"\b[a-z]{4}\d{4}\b")
+
+
+def normalize_question(question):
+    """Lower-case a question and fold years, semesters and common synonyms into canonical tokens"""
+    text = (question or "").lower()
+    text = re.sub(r"[’']s\b", "", text)
+    text = re.sub(rf"\b(?:year|yr)s?\s*({NUMBER_PATTERN})\b", lambda m: f" year{NUMBER_WORDS[m.group(1)]} ", text)
+    text = re.sub(rf"\b({NUMBER_PATTERN})[\s-]*(?:year|yr)s?\b", lambda m: f" year{NUMBER_WORDS[m.group(1)]} ", text)
+    text = re.sub(rf"\b(?:semester|sem)s?\s*({NUMBER_PATTERN})\b", lambda m: f" sem{NUMBER_WORDS[m.group(1)]} ", text)
+    text = re.sub(rf"\b({NUMBER_PATTERN})\s+(?:semester|sem)s?\b", lambda m: f" sem{NUMBER_WORDS[m.group(1)]} ", text)
+    words = re.findall(r"[a-z0-9]+", text)
+    words = [SYNONYMS.get(w, w) for w in words if w not in STOPWORDS]
+    # Repeated synonyms ("cyber security" -> "cyber cyber") collapse to their first occurrence
+    return " ".join(dict.fromkeys(words))
+
+
+def question_signature(normalized):
+    """Tokens that must match exactly for two questions to share an answer (years, semesters, course codes)"""
+    tokens = re.findall(r"\b(?:year\w+|sem\w+)\b", normalized)
+    tokens += COURSE_CODE_PATTERN.findall(normalized)
+    return " ".join(sorted(set(tokens)))
+
+
+def hashed_features(normalized, dim=EMBEDDING_DIM):
+    """Sublinear term-frequency vector over hashed word unigrams, bigrams and character trigrams"""
+    vector = np.zeros(dim, dtype=np.float32)
+    words = normalized.split()
+    features = list(words)
+    features += [f"{a} {b}" for a, b in zip(words, words[1:])]
+    for word in words:
+        padded = f"#{word}#"
+        features += [padded[i:i + 3] for i in range(len(padded) - 2)]
+    for feature in features:
+        vector[zlib.crc32(feature.encode("utf-8")) % dim] += 1.0
+    nonzero = vector > 0
+    vector[nonzero] = 1.0 + np.log(vector[nonzero])
+    return vector
+
+
+def dataset_hash(*parts):
+    """Stable hash of the data an answer was generated from (file bytes, DB rows, ...)"""
+    digest = hashlib.sha256()
+    for part in parts:
+        if part is None:
+            continue
+        if isinstance(part, str):
+            part = part.encode("utf-8")
+        digest.update(part)
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class AnswerCache:
+    """In-memory near-duplicate answer cache backed by a NumPy matrix of TF-IDF question vectors.
+
+    Entries are scoped by (data source, dataset hash, question signature) so an answer is only
+    reused for the same data and the same years, semesters and course codes.
+    """
+
+    def __init__(self, threshold=SIMILARITY_THRESHOLD, max_entries=MAX_ENTRIES, dim=EMBEDDING_DIM):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.dim = dim
+        self._lock = threading.Lock()
+        self._vectors = np.zeros((max_entries, dim), dtype=np.float32)
+        self._doc_freq = np.zeros(dim, dtype=np.float32)
+        self._used = np.zeros(max_entries, dtype=bool)
+        self._last_used = np.zeros(max_entries, dtype=np.float64)
+        self._scopes = np.empty(max_entries, dtype=object)
+        self._entries = [None] * max_entries
+        self.hits = 0
+        self.misses = 0
+        self.false_hits = 0
+        self.evictions = 0
+
+    def _scope(self, data_source, data_hash, normalized):
+        return f"{data_source}|{data_hash}|{question_signature(normalized)}"
+
+    def _idf(self):
+        count = int(self._used.sum())
+        return np.log((1.0 + count) / (1.0 + self._doc_freq)) + 1.0
+
+    def _nearest(self, vector, scope):
+        """Index and cosine similarity of the closest cached question in the same scope"""
+        candidates = np.flatnonzero(self._used & (self._scopes == scope))
+        if candidates.size == 0:
+            return None, 0.0
+        idf = self._idf()
+        query = vector * idf
+        query_norm = np.linalg.norm(query)
+        if query_norm == 0:
+            return None, 0.0
+        matrix = self._vectors[candidates] * idf
+        norms = np.linalg.norm(matrix, axis=1)
+        norms[norms == 0] = 1.0
+        similarities = (matrix @ query) / (norms * query_norm)
+        best = int(np.argmax(similarities))
+        return int(candidates[best]), float(similarities[best])
+
+    def lookup(self, question, data_source, data_hash):
+        """Return a cached entry dict for a near-duplicate question, or None on a miss"""
+        normalized = normalize_question(question)
+        vector = hashed_features(normalized, self.dim)
+        with self._lock:
+            index, similarity = self._nearest(vector, self._scope(data_source, data_hash, normalized))
+            if index is None or similarity < self.threshold:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._last_used[index] = time.monotonic()
+            entry = dict(self._entries[index])
+            entry["similarity"] = similarity
+            return entry
+
+    def store(self, question, answer, data_source, data_hash):
+        normalized = normalize_question(question)
+        vector = hashed_features(normalized, self.dim)
+        scope = self._scope(data_source, data_hash, normalized)
+        with self._lock:
+            index, similarity = self._nearest(vector, scope)
+            if index is not None and similarity >= 0.999:
+                # Same question again; refresh the answer in place
+                self._entries[index]["answer"] = answer
+                self._last_used[index] = time.monotonic()
+                return self._entries[index]["id"]
+            free = np.flatnonzero(~self._used)
+            if free.size:
+                index = int(free[0])
+            else:
+                index = int(np.argmin(self._last_used))
+                self._remove(index)
+                self.evictions += 1
+            self._vectors[index] = vector
+            self._doc_freq += vector > 0
+            self._used[index] = True
+            self._last_used[index] = time.monotonic()
+            self._scopes[index] = scope
+            entry_id = f"{index}:{dataset_hash(scope, normalized)[:16]}"
+            self._entries[index] = {"id": entry_id, "question": question, "answer": answer}
+            return entry_id
+
+    def _remove(self, index):
+        self._doc_freq -= self._vectors[index] > 0
+        self._vectors[index] = 0
+        self._used[index] = False
+        self._last_used[index] = 0
+        self._scopes[index] = None
+        self._entries[index] = None
+
+    def report_false_hit(self, entry_id):
+        """Record that a reused answer did not fit the question and drop it from the cache.
+
+        Stale or repeated ids (the entry was already evicted or reported) are ignored.
+        """
+        with self._lock:
+            index = int(str(entry_id).split(":", 1)[0])
+            if 0 <= index < self.max_entries and self._entries[index] and self._entries[index]["id"] == entry_id:
+                self.false_hits += 1
+                self._remove(index)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": int(self._used.sum()),
+                "max_entries": self.max_entries,
+                "threshold": self.threshold,
+                "hits": self.hits,
+                "misses": self.misses,
+                "false_hits": self.false_hits,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
@@ -1,18 +1,19 @@
 
 import streamlit as st
 import json
-import boto3
-from datetime import datetime
-from PyPDF2 import PdfReader
-import requests
-from bs4 import BeautifulSoup
+import hashlib
 from dotenv import load_dotenv
 import os
-import csv
 import io
-import sqlite3
-import pdfplumber
 import time
+from study_planner import (
+    build_catalog, parse_plan_question, plan_study, format_plan, build_plan_prompt,
+    COURSES_FILE, STRUCTURE_FILE,
+)
+from resource_cache import get_or_create, peek, prefetch, put
+
+# Heavy dependencies (boto3, PyPDF2, pdfplumber, sqlite3, csv, numpy via answer_cache) are
+# imported on first use of the feature that needs them so the login page renders quickly.
 
 # === AWS Configuration === #
 REGION = "us-east-1"
@@ -26,9 +27,21 @@ load_dotenv()
 DEFAULT_USERNAME = os.getenv("RMIT_USERNAME")
 DEFAULT_PASSWORD = os.getenv("RMIT_PASSWORD")
 
+# Semantic answer cache settings (defaults live in answer_cache.py)
+ANSWER_CACHE_THRESHOLD = os.getenv("ANSWER_CACHE_THRESHOLD")
+ANSWER_CACHE_MAX_ENTRIES = os.getenv("ANSWER_CACHE_MAX_ENTRIES")
+
+# Cognito identity credentials last an hour; refresh well before they expire
+CREDENTIALS_TTL = 45 * 60
+
+# Catalogs built from uploaded files are dropped after an hour so distinct uploads don't accumulate
+CATALOG_TTL = 60 * 60
+
 
 def get_credentials(username=None, password=None):
     """Get AWS credentials with better error handling"""
+    import boto3
+
     try:
         if username is None or password is None:
             username = DEFAULT_USERNAME
@@ -59,6 +72,88 @@ def get_credentials(username=None, password=None):
         print(f"Authentication error: {e}")  # For debugging
         raise e
 
+def credentials_key(username, password):
+    # Never keep the plain password in cache keys
+    return username, hashlib.sha256((password or "").encode("utf-8")).hexdigest()
+
+def get_cached_credentials(username=None, password=None):
+    """Temporary AWS credentials for Bedrock calls, reused across requests until shortly before they expire"""
+    if username is None or password is None:
+        username, password = DEFAULT_USERNAME, DEFAULT_PASSWORD
+    return get_or_create(
+        ("credentials",) + credentials_key(username, password),
+        lambda: get_credentials(username, password),
+        ttl=CREDENTIALS_TTL,
+    )
+
+def authenticate(username, password):
+    """Log in against Cognito and cache the fresh credentials for the Bedrock calls that follow"""
+    # Always ask Cognito so disabled accounts and changed passwords are refused
+    credentials = get_credentials(username, password)
+    put(("credentials",) + credentials_key(username, password), credentials, ttl=CREDENTIALS_TTL)
+    return credentials
+
+def get_bedrock_client(username=None, password=None):
+    """Bedrock runtime client for the user's current credentials.
+
+    The client is keyed by the credentials' AccessKeyId, so it is replaced as soon as the
+    cached credentials are refreshed rather than outliving them.
+    """
+    if username is None or password is None:
+        username, password = DEFAULT_USERNAME, DEFAULT_PASSWORD
+    credentials = get_cached_credentials(username, password)
+
+    def create():
+        import boto3
+
+        return boto3.client(
+            "bedrock-runtime",
+            region_name=REGION,
+            aws_access_key_id=credentials["AccessKeyId"],
+            aws_secret_access_key=credentials["SecretKey"],
+            aws_session_token=credentials["SessionToken"],
+        )
+
+    key = ("bedrock",) + credentials_key(username, password) + (credentials["AccessKeyId"],)
+    return get_or_create(key, create, ttl=CREDENTIALS_TTL)
+
+def get_catalog(courses_bytes, structure_bytes):
+    """Study-planner catalog for the given course/structure files, built once per distinct pair"""
+    key = ("catalog", hashlib.sha256(courses_bytes).hexdigest(), hashlib.sha256(structure_bytes).hexdigest())
+    return get_or_create(key, lambda: build_catalog(json.loads(courses_bytes), json.loads(structure_bytes)),
+                         ttl=CATALOG_TTL)
+
+def get_answer_cache():
+    """Answer cache shared by all sessions of this app instance"""
+    def create():
+        from answer_cache import AnswerCache
+
+        options = {}
+        if ANSWER_CACHE_THRESHOLD:
+            options["threshold"] = float(ANSWER_CACHE_THRESHOLD)
+        if ANSWER_CACHE_MAX_ENTRIES:
+            options["max_entries"] = int(ANSWER_CACHE_MAX_ENTRIES)
+        return AnswerCache(**options)
+
+    return get_or_create("answer_cache", create)
+
+def read_bytes(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+def get_bundled_catalog():
+    """Catalog and dataset hash of the bundled course/structure files, used for sources without a program structure"""
+    from answer_cache import dataset_hash
+
+    courses_bytes, structure_bytes = read_bytes(COURSES_FILE), read_bytes(STRUCTURE_FILE)
+    return get_catalog(courses_bytes, structure_bytes), dataset_hash(courses_bytes, structure_bytes)
+
+def start_prefetch(username, password):
+    """Warm up what the main page needs while the user is still choosing a data source"""
+    prefetch(get_bundled_catalog)
+    prefetch(lambda: get_bedrock_client(username, password), "bedrock_client")
+    prefetch(get_answer_cache)
+
 def build_prompt(courses, user_question, structure=None):
     course_dict = {c["title"]: c for c in courses}
 
@@ -100,6 +195,8 @@ def build_prompt(courses, user_question, structure=None):
     return prompt
 
 def extract_text_from_pdfs(pdf_files):
+    from PyPDF2 import PdfReader
+
     all_text = []
     for pdf_file in pdf_files:
         try:
@@ -113,6 +210,8 @@ def extract_text_from_pdfs(pdf_files):
     return "\n\n".join(all_text)
 
 def convert_pdf_to_json(uploaded_files):
+    import pdfplumber
+
     pdf_data = {}
     for i, f in enumerate(uploaded_files, start=1):
         try:
@@ -124,15 +223,7 @@ def convert_pdf_to_json(uploaded_files):
     return pdf_data
 
 def invoke_bedrock(prompt_text, username=None, password=None, max_tokens=640, temperature=0.3, top_p=0.9):
-    credentials = get_credentials(username, password)
-
-    bedrock_runtime = boto3.client(
-        "bedrock-runtime",
-        region_name=REGION,
-        aws_access_key_id=credentials["AccessKeyId"],
-        aws_secret_access_key=credentials["SecretKey"],
-        aws_session_token=credentials["SessionToken"],
-    )
+    bedrock_runtime = get_bedrock_client(username, password)
 
     payload = {
         "anthropic_version": "bedrock-2023-05-31",
@@ -163,6 +254,8 @@ if "username" not in st.session_state:
     st.session_state.username = ""
 if "password" not in st.session_state:
     st.session_state.password = ""
+if "cached_answer_id" not in st.session_state:
+    st.session_state.cached_answer_id = None
 
 # === Login UI ===
 if not st.session_state.logged_in:
@@ -230,7 +323,7 @@ if not st.session_state.logged_in:
                     else:
                         with st.spinner("🔄 Authenticating..."):
                             try:
-                                get_credentials(username_input, password_input)
+                                authenticate(username_input, password_input)
                                 st.session_state.logged_in = True
                                 st.session_state.username = username_input
                                 st.session_state.password = password_input
@@ -257,7 +350,7 @@ if not st.session_state.logged_in:
                                 st.error("❌ Guest credentials not configured")
                                 st.info("💡 Please contact administrator to set up guest access")
                             else:
-                                get_credentials(DEFAULT_USERNAME, DEFAULT_PASSWORD)
+                                authenticate(DEFAULT_USERNAME, DEFAULT_PASSWORD)
                                 st.session_state.logged_in = True
                                 st.session_state.username = DEFAULT_USERNAME  # Use actual guest username here
                                 st.session_state.password = DEFAULT_PASSWORD
@@ -318,6 +411,11 @@ if not st.session_state.logged_in:
 
 else:
     # === Main App Interface ===
+    # Warm up the catalog, Bedrock client and answer cache in the background once per session
+    if not st.session_state.get("prefetch_started"):
+        start_prefetch(st.session_state.username, st.session_state.password)
+        st.session_state.prefetch_started = True
+
     # Header with user info and logout
     st.markdown("""
     <div style="background: linear-gradient(90deg, #E40613 0%, #FF6B7A 100%); padding: 1rem; border-radius: 10px; margin-bottom: 1rem;">
@@ -338,6 +436,7 @@ else:
             st.session_state.logged_in = False
             st.session_state.username = ""
             st.session_state.password = ""
+            st.session_state.prefetch_started = False
             st.success("👋 Logged out successfully!")
             time.sleep(1)
             st.rerun()
@@ -401,6 +500,8 @@ else:
     elif data_source == "🗄️ Use Database":
         with st.expander("⚙️ Database Information", expanded=True):
             try:
+                import sqlite3
+
                 conn = sqlite3.connect("extracted_data.db")
                 cursor = conn.cursor()
                 
@@ -444,6 +545,11 @@ else:
         placeholder="e.g., I'm a second-year student interested in digital forensics and blockchain. What courses should I take?",
         height=100
     )
+    explain_plan = st.checkbox(
+        "🧭 Explain computed study plans with AI",
+        value=False,
+        help="Study-plan questions (e.g. 'What should I take in year 2 semester 1?') are answered locally from the program structure. Tick to also have the AI explain the plan."
+    )
 
     # === Get Advice Button ===
     if st.button("🎯 Get Course Advice", type="primary", use_container_width=True):
@@ -452,19 +558,54 @@ else:
         else:
             try:
                 with st.spinner("🔍 Generating personalized advice..."):
+                    from answer_cache import dataset_hash
+
+                    answer = None
+                    make_prompt = None
+                    plan = None
+                    plan_from_bundled = False
+                    cache_source = data_source
+                    # Structured study-plan questions are planned locally from the catalog graph.
+                    # Uploaded JSON files carry their own structure; the database has none, so it uses the
+                    # bundled catalog. CSV and PDF questions stay with the model and the user's own data.
+                    if data_source == "🗄️ Use Database":
+                        try:
+                            catalog, catalog_hash = get_bundled_catalog()
+                        except (OSError, ValueError) as e:
+                            print(f"Bundled catalog unavailable, study-plan questions go to the model: {e}")
+                            catalog = None
+                        plan_query = parse_plan_question(user_question, catalog) if catalog else None
+                        if plan_query:
+                            plan = plan_study(catalog, **plan_query)
+                            plan_from_bundled = True
+                            cache_source, data_hash = "bundled catalog", catalog_hash
+
                     # Process based on data source
                     if data_source == "📄 Upload Files":
                         if upload_format == "JSON files":
                             if not uploaded_courses_json or not uploaded_structure_json:
                                 st.warning("⚠️ Please upload both JSON files.")
                                 st.stop()
-                            courses = json.load(uploaded_courses_json)
-                            structure = json.load(uploaded_structure_json)
-                            prompt = build_prompt(courses, user_question, structure)
+                            cache_source = f"{data_source} JSON"
+                            courses_bytes = uploaded_courses_json.getvalue()
+                            structure_bytes = uploaded_structure_json.getvalue()
+                            data_hash = dataset_hash(courses_bytes, structure_bytes)
+                            catalog = get_catalog(courses_bytes, structure_bytes)
+                            plan_query = parse_plan_question(user_question, catalog)
+                            if plan_query:
+                                plan = plan_study(catalog, **plan_query)
+                            else:
+                                courses = json.loads(courses_bytes)
+                                structure = json.loads(structure_bytes)
+                                prompt = build_prompt(courses, user_question, structure)
                         else:  # CSV files
                             if not uploaded_courses_csv or not uploaded_structure_csv:
                                 st.warning("⚠️ Please upload both CSV files.")
                                 st.stop()
+                            import csv
+
+                            cache_source = f"{data_source} CSV"
+                            data_hash = dataset_hash(uploaded_courses_csv.getvalue(), uploaded_structure_csv.getvalue())
                             courses = list(csv.DictReader(io.StringIO(uploaded_courses_csv.getvalue().decode("utf-8"))))
                             structure = list(csv.DictReader(io.StringIO(uploaded_structure_csv.getvalue().decode("utf-8"))))
                             prompt = build_prompt(courses, user_question, structure)
@@ -473,15 +614,18 @@ else:
                         if not uploaded_pdfs:
                             st.warning("⚠️ Please upload at least one PDF file.")
                             st.stop()
-                        extracted_text = extract_text_from_pdfs(uploaded_pdfs)
-                        prompt = (
+                        data_hash = dataset_hash(*[f.getvalue() for f in uploaded_pdfs])
+                        # Text extraction is the slowest local stage, so it only runs on an answer-cache miss
+                        make_prompt = lambda: (
                             "You are a course advisor. The following is extracted from official course documents:\n\n"
-                            + extracted_text +
+                            + extract_text_from_pdfs(uploaded_pdfs) +
                             "\n\nPlease answer the following question based on this information:\n"
                             + user_question
                         )
                     
-                    else:  # Database
+                    elif plan is None:  # Database
+                        import sqlite3
+
                         try:
                             conn = sqlite3.connect("extracted_data.db")
                             cursor = conn.cursor()
@@ -571,6 +715,7 @@ else:
                                 course_list.append(course_text)
                         
                             course_text = "\n".join(course_list)
+                            data_hash = dataset_hash(course_text)
                             
                         except sqlite3.Error as db_error:
                             st.error(f"Database error: {str(db_error)}")
@@ -583,13 +728,59 @@ else:
                         # Simple prompt format
                         prompt = f"You're a course advisor for RMIT students. Here is the course content:\n\n{course_text}\n\nUser asks:\n{user_question}"
 
-                    # Get advice from Claude
-                    answer = invoke_bedrock(prompt, st.session_state.username, st.session_state.password)
+                    if plan is not None:
+                        if explain_plan:
+                            prompt = build_plan_prompt(plan, user_question)
+                            # Explanations are only reused for exactly the same computed plan
+                            data_hash = dataset_hash(data_hash, format_plan(plan))
+                        else:
+                            answer = format_plan(plan)
+
+                    # Reuse a cached answer to a near-duplicate question on the same data
+                    cached = None
+                    st.session_state.cached_answer_id = None
+                    if answer is None:
+                        answer_cache = get_answer_cache()
+                        cached = answer_cache.lookup(user_question, cache_source, data_hash)
+                        if cached:
+                            answer = cached["answer"]
+                            st.session_state.cached_answer_id = cached["id"]
+                        else:
+                            if make_prompt:
+                                prompt = make_prompt()
+                            # Get advice from Claude
+                            answer = invoke_bedrock(prompt, st.session_state.username, st.session_state.password)
+                            answer_cache.store(user_question, answer, cache_source, data_hash)
                     
                     # Display results
                     st.success("✅ Advice Generated Successfully!")
+                    if cached:
+                        st.caption(f"♻️ Reused answer to a similar question: \"{cached['question']}\" (similarity {cached['similarity']:.2f})")
+                    if plan_from_bundled:
+                        st.caption("🧭 Study plan computed from the bundled course list and program structure "
+                                   "(courses_data.json, cyber_security_program_structure.json), not from the database.")
                     st.markdown("### 🤖 Course Recommendation")
                     st.markdown(answer)
 
             except Exception as e:
                 st.error(f"❌ An error occurred: {str(e)}")
+
+    # A reused answer that didn't fit is counted as a false hit and dropped from the cache
+    if st.session_state.cached_answer_id:
+        if st.button("👎 This cached answer doesn't match my question"):
+            get_answer_cache().report_false_hit(st.session_state.cached_answer_id)
+            st.session_state.cached_answer_id = None
+            st.info("Thanks! Ask again to get a fresh answer.")
+
+    with st.expander("♻️ Answer Cache Stats", expanded=False):
+        # Don't create the cache (and import NumPy) just to show empty stats
+        answer_cache = peek("answer_cache")
+        stats = answer_cache.stats() if answer_cache else {
+            "entries": 0, "max_entries": 0, "hits": 0, "misses": 0, "false_hits": 0, "evictions": 0, "hit_rate": 0.0,
+        }
+        st.write(
+            f"**Entries:** {stats['entries']}/{stats['max_entries']} · "
+            f"**Hits:** {stats['hits']} · **Misses:** {stats['misses']} · "
+            f"**False hits:** {stats['false_hits']} · **Evictions:** {stats['evictions']} · "
+            f"**Hit rate:** {stats['hit_rate']:.0%}"
+        )
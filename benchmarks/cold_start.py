@@ -0,0 +1,88 @@
+"""Measure login-page time-to-render of app.py in fresh processes, with an import-time profile.
+
+Usage:
+    python benchmarks/cold_start.py [--runs 5] [--top 15]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs inside a fresh interpreter so nothing is already imported
+CHILD_SCRIPT = """
+import json, sys, time
+from streamlit.testing.v1 import AppTest
+
+start = time.perf_counter()
+at = AppTest.from_file("app.py", default_timeout=120)
+at.run()
+render_s = time.perf_counter() - start
+heavy = ["boto3", "botocore", "PyPDF2", "pdfplumber", "numpy", "requests", "bs4", "sqlite3", "csv"]
+print(json.dumps({
+    "render_s": render_s,
+    "exception": [str(e.value) for e in at.exception],
+    "login_form": any(getattr(f, "form_id", None) == "login_form" for f in at.text_input),
+    "loaded": [name for name in heavy if name in sys.modules],
+}))
+"""
+
+def run_once(importtime=False):
+    cmd = [sys.executable]
+    if importtime:
+        cmd += ["-X", "importtime"]
+    cmd += ["-c", CHILD_SCRIPT]
+    # Keep real credentials out of the benchmark
+    env = dict(os.environ, RMIT_USERNAME="", RMIT_PASSWORD="")
+    result = subprocess.run(cmd, cwd=PROJECT_DIR, env=env, capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1]), result.stderr
+
+def parse_importtime(stderr, top):
+    """Top-level packages by cumulative import time from ``python -X importtime`` output"""
+    totals = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = [part.strip() for part in line[len("import time:"):].split("|")]
+        if not cumulative.isdigit():
+            continue
+        # Only count modules imported at the top of the tree (no leading indentation)
+        raw_name = line.split("|")[2]
+        if raw_name.startswith("  "):
+            continue
+        package = name.split(".")[0]
+        totals[package] = totals.get(package, 0) + int(cumulative)
+    return sorted(totals.items(), key=lambda item: item[1], reverse=True)[:top]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="fresh processes to time")
+    parser.add_argument("--top", type=int, default=15, help="packages to show in the import profile")
+    args = parser.parse_args()
+
+    timings = []
+    for i in range(args.runs):
+        result, _ = run_once()
+        if result["exception"]:
+            print(f"Run {i + 1} raised: {result['exception']}")
+        timings.append(result["render_s"])
+        print(f"Run {i + 1}: login page rendered in {result['render_s'] * 1000:.0f} ms")
+
+    profile_result, stderr = run_once(importtime=True)
+
+    print("\n=== Login page time-to-render ===")
+    print(f"runs: {len(timings)}")
+    print(f"median: {statistics.median(timings) * 1000:.0f} ms")
+    print(f"min: {min(timings) * 1000:.0f} ms  max: {max(timings) * 1000:.0f} ms")
+    print(f"login form rendered: {profile_result['login_form']}")
+    print(f"heavy modules loaded at login: {', '.join(profile_result['loaded']) or 'none'}")
+
+    print(f"\n=== Import-time profile (top {args.top}, cumulative) ===")
+    for package, micros in parse_importtime(stderr, args.top):
+        print(f"{micros / 1000:10.1f} ms  {package}")
+
+if __name__ == "__main__":
+    main()
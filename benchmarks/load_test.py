@@ -0,0 +1,564 @@
+"""Load test: ramp concurrent advisor sessions against one app instance and report its capacity.
+
+Each simulated student is a Streamlit AppTest session of app.py running in this process, which
+is how one Streamlit server serves its sessions. The session logs in through the login form and
+then repeatedly asks questions against its data source (JSON upload, extracted_data.db or the
+bundled PDFs). Cognito and Bedrock are replaced by local stand-ins with configurable latency,
+so no AWS account is needed and the numbers measure the app itself.
+
+Usage:
+    python benchmarks/load_test.py --levels 1,2,4,8,16 --duration 30
+    python benchmarks/load_test.py --mix json=1,db=1,pdf=0 --slo 5 --json report.json
+    python benchmarks/load_test.py --cache-hit-ratio 0.5
+
+Every level starts from empty caches. By default every question is unique, so free-form questions
+always reach Bedrock; --cache-hit-ratio repeats questions from a small pool instead.
+"""
+import argparse
+import glob
+import io
+import json
+import logging
+import os
+import random
+import statistics
+import string
+import sys
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_FILE = os.path.join(PROJECT_DIR, "app.py")
+PDF_DIR = os.path.join(PROJECT_DIR, "Fw_ BP355 enrolment project")
+
+SOURCE_LABELS = {
+    "json": "📄 Upload Files",
+    "db": "🗄️ Use Database",
+    "pdf": "📝 Extract from PDFs",
+}
+
+# Mix of plan questions, paraphrases (answer cache) and free-form questions
+QUESTIONS = [
+    "What should I take in year 2 semester 1?",
+    "cyber courses for 2nd year",
+    "what do second years take in cyber security",
+    "Which cyber security units should I study in year two?",
+    "How do I enrol in COSC1111?",
+    "how to enroll in COSC1111",
+    "What's the difference between COSC2626 and INTE2402?",
+    "Which courses cover digital forensics?",
+    "I'm interested in blockchain and cloud, what electives should I choose?",
+    "I'm in third year doing the Cloud Computing minor, what should I take?",
+]
+
+STAGES = ["cognito", "bedrock", "answer_cache", "planner", "pdf_extract"]
+
+
+class StageTimes:
+    """Thread-safe totals of time spent per pipeline stage during one ramp level"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.totals = defaultdict(float)
+            self.counts = defaultdict(int)
+
+    def add(self, stage, seconds):
+        with self.lock:
+            self.totals[stage] += seconds
+            self.counts[stage] += 1
+
+    def snapshot(self):
+        with self.lock:
+            return dict(self.totals), dict(self.counts)
+
+
+stage_times = StageTimes()
+
+
+@contextmanager
+def timed(stage):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        stage_times.add(stage, time.perf_counter() - start)
+
+
+def wrap_timed(stage, func):
+    def wrapper(*args, **kwargs):
+        with timed(stage):
+            return func(*args, **kwargs)
+    wrapper.__wrapped__ = func
+    return wrapper
+
+
+# === Local AWS stand-ins === #
+
+class StandInBody:
+    def __init__(self, payload):
+        self.payload = payload
+
+    def read(self):
+        return self.payload
+
+
+class CognitoStandIn:
+    """Answers the three Cognito calls made by get_credentials after a fixed delay"""
+
+    def __init__(self, latency):
+        self.latency = latency
+
+    def initiate_auth(self, AuthParameters=None, **kwargs):
+        with timed("cognito"):
+            time.sleep(self.latency)
+            if (AuthParameters or {}).get("PASSWORD") == "wrong":
+                raise Exception("NotAuthorizedException: Incorrect username or password.")
+            return {"AuthenticationResult": {"IdToken": "stand-in-id-token"}}
+
+    def get_id(self, **kwargs):
+        with timed("cognito"):
+            time.sleep(self.latency)
+            return {"IdentityId": "us-east-1:stand-in"}
+
+    def get_credentials_for_identity(self, **kwargs):
+        with timed("cognito"):
+            time.sleep(self.latency)
+            return {"Credentials": {"AccessKeyId": "AKIA-STAND-IN", "SecretKey": "secret", "SessionToken": "token"}}
+
+
+class BedrockStandIn:
+    """Sleeps like a model call (base latency plus a cost per 1k prompt characters) and returns a canned answer"""
+
+    def __init__(self, base_latency, per_kchar, error_rate, seed):
+        self.base_latency = base_latency
+        self.per_kchar = per_kchar
+        self.error_rate = error_rate
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+
+    def invoke_model(self, body=None, **kwargs):
+        with timed("bedrock"):
+            prompt = json.loads(body)["messages"][0]["content"]
+            with self.lock:
+                fail = self.rng.random() < self.error_rate
+                jitter = self.rng.uniform(0.9, 1.1)
+            time.sleep((self.base_latency + self.per_kchar * len(prompt) / 1000) * jitter)
+            if fail:
+                raise Exception("ThrottlingException: Rate exceeded (stand-in)")
+            answer = {"content": [{"text": f"Stand-in advice for a {len(prompt)} character prompt."}]}
+            return {"body": StandInBody(json.dumps(answer).encode("utf-8"))}
+
+
+def allow_concurrent_apptests():
+    """Make process-wide AppTest state safe for overlapping runs.
+
+    For each run AppTest installs a mock Runtime singleton and sets the ``global.appTest`` config
+    option, then clears both when the run ends. With concurrent sessions one run would clear them
+    under another, so set the option once and keep serving the most recent (interchangeable) mock.
+    AppTest also compiles app.py on every run; like a real server, share one script cache (which
+    also avoids concurrent ast.parse calls, which are not thread-safe on some CPython versions).
+    """
+    from contextlib import nullcontext
+    from streamlit import config
+    from streamlit.runtime import Runtime
+    from streamlit.testing.v1 import app_test, local_script_runner
+
+    config.set_option("global.appTest", True)
+    app_test.patch_config_options = lambda options: nullcontext()
+    script_cache = app_test.ScriptCache()
+    script_cache.get_bytecode(APP_FILE)
+    app_test.ScriptCache = local_script_runner.ScriptCache = lambda: script_cache
+
+    last = []
+
+    def instance(cls):
+        if cls._instance is not None:
+            last[:] = [cls._instance]
+            return cls._instance
+        if last:
+            return last[0]
+        raise RuntimeError("Runtime hasn't been created!")
+
+    def exists(cls):
+        return cls._instance is not None or bool(last)
+
+    Runtime.instance = classmethod(instance)
+    Runtime.exists = classmethod(exists)
+
+
+def install_stand_ins(args):
+    """Route boto3 clients to the stand-ins and time the local stages app.py calls into"""
+    import boto3
+    import streamlit
+    import PyPDF2
+    import study_planner
+    import answer_cache
+
+    cognito = CognitoStandIn(args.cognito_latency)
+    bedrock = BedrockStandIn(args.bedrock_latency, args.bedrock_per_kchar, args.bedrock_error_rate, args.seed)
+
+    def client(service_name, *a, **kwargs):
+        return bedrock if service_name == "bedrock-runtime" else cognito
+
+    boto3.client = client
+    allow_concurrent_apptests()
+    # app.py re-imports these names on every run, so patching the modules is enough
+    study_planner.plan_study = wrap_timed("planner", study_planner.plan_study)
+    answer_cache.AnswerCache.lookup = wrap_timed("answer_cache", answer_cache.AnswerCache.lookup)
+    answer_cache.AnswerCache.store = wrap_timed("answer_cache", answer_cache.AnswerCache.store)
+    PyPDF2.PageObject.extract_text = wrap_timed("pdf_extract", PyPDF2.PageObject.extract_text)
+    # AppTest cannot upload files, so uploaders return the files preloaded into the session
+    streamlit.file_uploader = stand_in_file_uploader
+
+
+class LoadTestFile(io.BytesIO):
+    """Minimal stand-in for Streamlit's UploadedFile"""
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            super().__init__(f.read())
+        self.name = os.path.basename(path)
+
+
+def stand_in_file_uploader(label, type=None, accept_multiple_files=False, key=None, **kwargs):
+    import streamlit
+
+    files = streamlit.session_state.get("_load_test_files", {})
+    return files.get(key)
+
+
+def session_files(source, pdf_limit):
+    if source == "json":
+        return {
+            "courses_json": LoadTestFile(os.path.join(PROJECT_DIR, "courses_data.json")),
+            "structure_json": LoadTestFile(os.path.join(PROJECT_DIR, "cyber_security_program_structure.json")),
+        }
+    if source == "pdf":
+        paths = sorted(glob.glob(os.path.join(PDF_DIR, "*.pdf")))[:pdf_limit]
+        return {"pdfs": [LoadTestFile(p) for p in paths]}
+    return {}
+
+
+# === Sessions === #
+
+def find_button(at, text):
+    return next(b for b in at.button if text in b.label)
+
+
+def run_session(index, source, window, args, results, lock):
+    from streamlit.testing.v1 import AppTest
+
+    rng = random.Random(args.seed * 1000 + index)
+    logged_in = False
+    try:
+        at = AppTest.from_file(APP_FILE, default_timeout=args.timeout)
+        at.session_state["_load_test_files"] = session_files(source, args.pdfs)
+
+        start = time.perf_counter()
+        at.run()
+        at.text_input[0].input(f"student{index}")
+        at.text_input[1].input("password")
+        find_button(at, "Login").click().run()
+        # The login handler sleeps and calls st.rerun(); run again to land on the main page
+        at.run()
+        login_s = time.perf_counter() - start
+        at.radio[0].set_value(SOURCE_LABELS[source]).run()
+        logged_in = True
+        with lock:
+            results["login"].append(login_s)
+    except Exception as e:
+        with lock:
+            results["session_errors"].append(f"{source} session {index}: {e}")
+    finally:
+        # Logins are not part of the measured window; wait until every session is on the main page
+        window["barrier"].wait()
+    if not logged_in:
+        return
+
+    while time.perf_counter() < window["deadline"]:
+        question = rng.choice(QUESTIONS)
+        if rng.random() >= args.cache_hit_ratio:
+            # A random course-code-like tag changes the cache signature, so the question misses
+            tag = "".join(rng.choices(string.ascii_uppercase, k=4)) + f"{rng.randrange(10000):04d}"
+            question += f" (ref {tag})"
+        start = time.perf_counter()
+        try:
+            at.text_area[0].input(question)
+            find_button(at, "Get Course Advice").click().run()
+            error = bool(at.exception) or bool(at.error)
+        except Exception as e:
+            # AppTest raises when a run exceeds its timeout; the session can't continue after that
+            with lock:
+                results["requests"].append({"source": source, "latency": time.perf_counter() - start, "error": True})
+                results["session_errors"].append(f"{source} session {index}: {e}")
+            return
+        latency = time.perf_counter() - start
+        with lock:
+            results["requests"].append({"source": source, "latency": latency, "error": error})
+        if args.think_time:
+            time.sleep(rng.uniform(0, 2 * args.think_time))
+
+
+def parse_mix(text):
+    weights = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in SOURCE_LABELS:
+            raise SystemExit(f"Unknown data source '{name}' in --mix (use json, db, pdf)")
+        weights[name] = float(weight or 1)
+    return {k: v for k, v in weights.items() if v > 0}
+
+
+def assign_sources(count, weights, seed):
+    """Spread sessions over data sources in proportion to the mix weights"""
+    names = sorted(weights)
+    total = sum(weights.values())
+    assigned = []
+    for name in names:
+        assigned += [name] * round(count * weights[name] / total)
+    rng = random.Random(seed)
+    while len(assigned) < count:
+        assigned.append(rng.choices(names, [weights[n] for n in names])[0])
+    assigned = assigned[:count]
+    rng.shuffle(assigned)
+    return assigned
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def memory_mb():
+    if psutil:
+        return psutil.Process().memory_info().rss / 2 ** 20
+    if resource:
+        # Peak RSS; kilobytes on Linux, bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 2 ** 20 if sys.platform == "darwin" else peak / 2 ** 10
+    return 0.0
+
+
+def run_level(sessions, args, weights):
+    import resource_cache
+
+    # Start each level cold so answers, credentials and catalogs cached by earlier levels don't carry over
+    resource_cache.clear()
+    results = {"requests": [], "login": [], "session_errors": []}
+    lock = threading.Lock()
+    sources = assign_sources(sessions, weights, args.seed + sessions)
+
+    window = {}
+
+    def open_window():
+        stage_times.reset()
+        window["cpu_start"] = os.times()
+        window["start"] = time.perf_counter()
+        window["deadline"] = window["start"] + args.duration
+
+    window["barrier"] = threading.Barrier(sessions, action=open_window)
+    threads = [
+        threading.Thread(target=run_session, args=(i, source, window, args, results, lock), daemon=True)
+        for i, source in enumerate(sources)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    cpu_start, start = window["cpu_start"], window["start"]
+    elapsed = time.perf_counter() - start
+    cpu_end = os.times()
+
+    requests = results["requests"]
+    latencies = [r["latency"] for r in requests]
+    # Sessions that failed before asking anything still count against the error rate
+    failed_logins = sessions - len(results["login"])
+    errors = sum(r["error"] for r in requests) + failed_logins
+    totals, counts = stage_times.snapshot()
+    request_count = max(len(requests), 1)
+    # The answer cache is created fresh in this level and only looked up inside the measured window
+    answer_cache = resource_cache.peek("answer_cache")
+    cache_stats = answer_cache.stats() if answer_cache else {"hits": 0, "misses": 0}
+    lookups = cache_stats["hits"] + cache_stats["misses"]
+    cpu_seconds = (cpu_end.user - cpu_start.user) + (cpu_end.system - cpu_start.system)
+
+    by_source = {}
+    for source in sorted(set(sources)):
+        source_latencies = [r["latency"] for r in requests if r["source"] == source]
+        by_source[source] = {
+            "requests": len(source_latencies),
+            "p50_s": percentile(source_latencies, 0.5),
+            "p99_s": percentile(source_latencies, 0.99),
+        }
+
+    return {
+        "sessions": sessions,
+        "sources": {s: sources.count(s) for s in sorted(set(sources))},
+        "requests": len(requests),
+        "elapsed_s": elapsed,
+        "throughput_rps": len(requests) / elapsed if elapsed else 0.0,
+        "p50_s": percentile(latencies, 0.5),
+        "p99_s": percentile(latencies, 0.99),
+        "mean_s": statistics.mean(latencies) if latencies else 0.0,
+        "error_rate": errors / max(len(requests) + failed_logins, 1),
+        "login_p50_s": percentile(results["login"], 0.5),
+        # Share of requests answered from the answer cache; study-plan answers are computed locally and skip it
+        "cache_hit_rate": cache_stats["hits"] / lookups if lookups else 0.0,
+        "planned_locally": counts.get("planner", 0) / request_count,
+        "cpu_percent": 100 * cpu_seconds / elapsed if elapsed else 0.0,
+        "memory_mb": memory_mb(),
+        # Mean seconds per advice request spent in each stage, including waiting for the GIL
+        "stages_s": {stage: totals.get(stage, 0.0) / request_count for stage in STAGES},
+        "stage_calls": {stage: counts.get(stage, 0) for stage in STAGES},
+        "by_source": by_source,
+        "session_errors": results["session_errors"][:5],
+    }
+
+
+def analyse(levels, slo, max_error_rate):
+    """Per-instance capacity and the stage that degrades first"""
+    within_slo = [l for l in levels if l["p99_s"] <= slo and l["error_rate"] <= max_error_rate]
+    capacity = max(within_slo, key=lambda l: l["sessions"]) if within_slo else None
+
+    # The knee is the first level where adding sessions stops adding throughput or breaks the SLO
+    knee = None
+    for previous, level in zip(levels, levels[1:]):
+        gain = level["throughput_rps"] / previous["throughput_rps"] if previous["throughput_rps"] else 0
+        if gain < 1.1 or level not in within_slo:
+            knee = level
+            break
+
+    saturating_stage = None
+    if knee:
+        baseline = levels[0]
+        other = {
+            l["sessions"]: l["mean_s"] - sum(l["stages_s"].values()) for l in (baseline, knee)
+        }
+        growth = {stage: knee["stages_s"][stage] - baseline["stages_s"][stage] for stage in STAGES}
+        # Time outside the measured stages is Streamlit script execution, DB reads and prompt building
+        growth["script/other"] = other[knee["sessions"]] - other[baseline["sessions"]]
+        saturating_stage = max(growth, key=growth.get)
+
+    return {
+        "slo_p99_s": slo,
+        "max_error_rate": max_error_rate,
+        "capacity_sessions": capacity["sessions"] if capacity else 0,
+        "capacity_throughput_rps": capacity["throughput_rps"] if capacity else 0.0,
+        "knee_sessions": knee["sessions"] if knee else None,
+        "saturating_stage": saturating_stage,
+    }
+
+
+def print_report(levels, summary):
+    print("\n=== Load test report ===")
+    header = (f"{'sessions':>8} {'reqs':>6} {'rps':>7} {'p50 s':>7} {'p99 s':>7} {'err %':>6} "
+              f"{'cpu %':>6} {'rss MB':>7} {'login s':>8} {'hit %':>6} {'plan %':>7}")
+    print(header)
+    for l in levels:
+        print(f"{l['sessions']:>8} {l['requests']:>6} {l['throughput_rps']:>7.2f} {l['p50_s']:>7.2f} "
+              f"{l['p99_s']:>7.2f} {100 * l['error_rate']:>6.1f} {l['cpu_percent']:>6.0f} {l['memory_mb']:>7.0f} "
+              f"{l['login_p50_s']:>8.2f} {100 * l['cache_hit_rate']:>6.0f} {100 * l['planned_locally']:>7.0f}")
+    print("hit % = answer-cache hits per cache lookup; plan % = requests answered by the local planner")
+
+    print("\nMean seconds per request by stage:")
+    print(f"{'sessions':>8} " + " ".join(f"{s:>12}" for s in STAGES) + f" {'script/other':>12}")
+    for l in levels:
+        other = l["mean_s"] - sum(l["stages_s"].values())
+        print(f"{l['sessions']:>8} " + " ".join(f"{l['stages_s'][s]:>12.3f}" for s in STAGES) + f" {other:>12.3f}")
+
+    print("\nLatency by data source (p50 / p99 s):")
+    for l in levels:
+        parts = [f"{src}: {v['p50_s']:.2f} / {v['p99_s']:.2f} ({v['requests']})" for src, v in l["by_source"].items()]
+        print(f"{l['sessions']:>8}  " + "  ".join(parts))
+
+    for l in levels:
+        for error in l["session_errors"]:
+            print(f"Session error at {l['sessions']} sessions: {error}")
+
+    print(f"\nCapacity: {summary['capacity_sessions']} concurrent sessions "
+          f"({summary['capacity_throughput_rps']:.2f} req/s) within p99 <= {summary['slo_p99_s']} s "
+          f"and errors <= {100 * summary['max_error_rate']:.0f}%")
+    if summary["knee_sessions"]:
+        print(f"Throughput stops scaling at {summary['knee_sessions']} sessions; "
+              f"first stage to saturate: {summary['saturating_stage']}")
+    else:
+        print("Throughput kept scaling across all levels; raise --levels to find the limit")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--levels", default="1,2,4,8,16", help="comma-separated concurrent session counts")
+    parser.add_argument("--duration", type=float, default=30, help="seconds to keep asking questions per level")
+    parser.add_argument("--mix", default="json=1,db=1,pdf=1", help="data source weights, e.g. json=2,db=1,pdf=1")
+    parser.add_argument("--pdfs", type=int, default=19, help="bundled PDFs uploaded by each PDF session")
+    parser.add_argument("--cache-hit-ratio", type=float, default=0.0,
+                        help="fraction of questions repeated from a small pool so the answer cache can hit "
+                             "(the rest are unique); the measured hit rate is reported per level")
+    parser.add_argument("--think-time", type=float, default=0.0, help="mean pause between questions (s)")
+    parser.add_argument("--timeout", type=float, default=120, help="per-run AppTest timeout (s)")
+    parser.add_argument("--cognito-latency", type=float, default=0.08, help="stand-in latency per Cognito call (s)")
+    parser.add_argument("--bedrock-latency", type=float, default=1.5, help="stand-in base Bedrock latency (s)")
+    parser.add_argument("--bedrock-per-kchar", type=float, default=0.005,
+                        help="extra stand-in Bedrock latency per 1000 prompt characters (s)")
+    parser.add_argument("--bedrock-error-rate", type=float, default=0.0, help="fraction of Bedrock calls that fail")
+    parser.add_argument("--slo", type=float, default=10.0, help="p99 latency target for capacity (s)")
+    parser.add_argument("--max-error-rate", type=float, default=0.01, help="error rate allowed for capacity")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--json", help="also write the full report to this file")
+    args = parser.parse_args()
+
+    if not 0 <= args.cache_hit_ratio <= 1:
+        parser.error("--cache-hit-ratio must be between 0 and 1")
+    weights = parse_mix(args.mix)
+    levels = [int(n) for n in args.levels.split(",")]
+
+    # app.py opens its data files and modules relative to the project directory
+    os.chdir(PROJECT_DIR)
+    sys.path.insert(0, PROJECT_DIR)
+    # Keep real credentials out of the run; every session logs in against the Cognito stand-in
+    os.environ["RMIT_USERNAME"] = ""
+    os.environ["RMIT_PASSWORD"] = ""
+    install_stand_ins(args)
+    # Setting session state from the driver threads logs a harmless "missing ScriptRunContext" warning
+    logging.getLogger("streamlit.runtime.scriptrunner_utils.script_run_context").setLevel(logging.ERROR)
+
+    results = []
+    for sessions in levels:
+        print(f"Running {sessions} concurrent sessions for {args.duration:.0f}s...")
+        level = run_level(sessions, args, weights)
+        print(f"  {level['requests']} requests, {level['throughput_rps']:.2f} req/s, "
+              f"p50 {level['p50_s']:.2f}s, p99 {level['p99_s']:.2f}s, errors {100 * level['error_rate']:.1f}%, "
+              f"cache hits {100 * level['cache_hit_rate']:.0f}%")
+        results.append(level)
+
+    summary = analyse(results, args.slo, args.max_error_rate)
+    print_report(results, summary)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"config": vars(args), "levels": results, "summary": summary}, f, indent=2)
+        print(f"\nFull report written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
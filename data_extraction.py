@@ -6,6 +6,27 @@ import xml.etree.ElementTree as ET
 import os
 import sqlite3
 import re
+import gzip
+import hashlib
+import argparse
+from datetime import datetime, timezone
+from concurrent.futures import ProcessPoolExecutor
+from html import unescape
+from urllib.parse import urlsplit, urlunsplit
+
+# zstd is optional; archived pages fall back to gzip when it isn't installed
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+ARCHIVE_DIR = "page_archive"
+ARCHIVE_INDEX = "index.db"
+
+# Pages whose 64-bit SimHash differs in at most this many bits are near duplicates
+SIMHASH_MAX_DISTANCE = 3
+# Pages with fewer shingles than this are only deduplicated on an exact content hash
+SIMHASH_MIN_SHINGLES = 20
 
 def download_sitemap(sitemap_url):
     response = requests.get(sitemap_url)
@@ -33,6 +54,187 @@ def download_page(url):
         print(f"Failed to download {url}: {e}")
         return None
 
+def canonicalize_url(url):
+    """Drop query strings, fragments and trailing slashes so tracking variants of a URL collapse together"""
+    parts = urlsplit(url.strip())
+    path = parts.path.rstrip('/') or '/'
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, '', ''))
+
+def extract_main_text(html_content):
+    """Cheap regex extraction of the visible main content, used for fingerprinting before parse_page"""
+    main = re.search(r'<main\b.*?</main>', html_content, re.S | re.I)
+    text = main.group(0) if main else html_content
+    text = re.sub(r'<(script|style|noscript|nav|header|footer)\b.*?</\1>', ' ', text, flags=re.S | re.I)
+    text = re.sub(r'<[^>]+>', ' ', text)
+    return ' '.join(unescape(text).lower().split())
+
+def extract_program_code(html_content):
+    for tag in re.findall(r'<meta\b[^>]*>', html_content, re.I):
+        if re.search(r'name\s*=\s*["\']s_programcode["\']', tag, re.I):
+            match = re.search(r'content\s*=\s*["\']([^"\']*)', tag, re.I)
+            return match.group(1).strip() if match else ''
+    return ''
+
+def simhash(text):
+    """64-bit SimHash over word 3-shingles; returns (fingerprint, shingle count)"""
+    words = text.split()
+    shingles = [' '.join(words[i:i + 3]) for i in range(max(len(words) - 2, 1))] if words else []
+    weights = [0] * 64
+    for shingle in shingles:
+        value = int.from_bytes(hashlib.blake2b(shingle.encode('utf-8'), digest_size=8).digest(), 'big')
+        for bit in range(64):
+            weights[bit] += 1 if value >> bit & 1 else -1
+    fingerprint = 0
+    for bit in range(64):
+        if weights[bit] > 0:
+            fingerprint |= 1 << bit
+    return fingerprint, len(shingles)
+
+def page_fingerprint(html_content):
+    """Program code, exact content hash and SimHash of a page's normalized main content"""
+    text = extract_main_text(html_content)
+    content_hash = hashlib.sha256(text.encode('utf-8')).hexdigest()
+    fingerprint, shingle_count = simhash(text)
+    return {
+        "program_code": extract_program_code(html_content),
+        "content_hash": content_hash,
+        "simhash": fingerprint,
+        "shingles": shingle_count,
+    }
+
+class PageDeduplicator:
+    """Tracks canonical pages and maps exact and near-duplicate pages onto them as alias URLs"""
+
+    def __init__(self, max_distance=SIMHASH_MAX_DISTANCE):
+        self.max_distance = max_distance
+        # With at most 3 differing bits, two near duplicates share at least one of 4 16-bit bands
+        self.band_count = max_distance + 1
+        self.band_bits = 64 // self.band_count
+        self.by_hash = {}
+        self.bands = {}
+        self.fingerprints = {}
+        self.aliases = {}
+
+    def band_keys(self, fingerprint):
+        mask = (1 << self.band_bits) - 1
+        return [(i, fingerprint >> (i * self.band_bits) & mask) for i in range(self.band_count)]
+
+    def find_duplicate(self, url, fp):
+        """Return the canonical URL if this page duplicates one seen before, otherwise register it and return None"""
+        # Near-identical pages for different programs (e.g. BP355/BP356) are never merged
+        hash_key = (fp["program_code"], fp["content_hash"])
+        canonical = self.by_hash.get(hash_key)
+        if canonical is None and fp["shingles"] >= SIMHASH_MIN_SHINGLES:
+            for key in self.band_keys(fp["simhash"]):
+                for candidate in self.bands.get(key, []):
+                    other = self.fingerprints[candidate]
+                    if (other["program_code"] == fp["program_code"]
+                            and bin(other["simhash"] ^ fp["simhash"]).count('1') <= self.max_distance):
+                        canonical = candidate
+                        break
+                if canonical:
+                    break
+        if canonical:
+            self.add_alias(canonical, url)
+            return canonical
+
+        self.by_hash[hash_key] = url
+        self.fingerprints[url] = fp
+        self.aliases.setdefault(url, [])
+        if fp["shingles"] >= SIMHASH_MIN_SHINGLES:
+            for key in self.band_keys(fp["simhash"]):
+                self.bands.setdefault(key, []).append(url)
+        return None
+
+    def add_alias(self, canonical, url):
+        aliases = self.aliases.setdefault(canonical, [])
+        if url != canonical and url not in aliases:
+            aliases.append(url)
+
+def merge_records_by_code(data_list):
+    """Keep the first record per course code and fold later records' URLs into its aliases"""
+    merged = []
+    by_code = {}
+    for data in data_list:
+        code = data.get('course_code', '')
+        if code and code in by_code:
+            canonical = by_code[code]
+            for url in [data.get('url', '')] + data.get('alias_urls', []):
+                if url and url != canonical.get('url') and url not in canonical['alias_urls']:
+                    canonical['alias_urls'].append(url)
+            continue
+        data.setdefault('alias_urls', [])
+        if code:
+            by_code[code] = data
+        merged.append(data)
+    return merged
+
+def archive_blob_path(archive_dir, content_hash, codec):
+    extension = "zst" if codec == "zstd" else "gz"
+    return os.path.join(archive_dir, content_hash[:2], f"{content_hash}.html.{extension}")
+
+def open_archive_index(archive_dir):
+    os.makedirs(archive_dir, exist_ok=True)
+    conn = sqlite3.connect(os.path.join(archive_dir, ARCHIVE_INDEX))
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS pages (
+            url TEXT PRIMARY KEY,
+            content_hash TEXT,
+            codec TEXT,
+            size INTEGER,
+            compressed_size INTEGER,
+            fetched_at TEXT
+        )
+    ''')
+    return conn
+
+def archive_page(conn, archive_dir, url, html_content):
+    """Store a fetched page as a compressed blob named by its SHA-256 and record the URL in the index"""
+    raw = html_content.encode('utf-8')
+    content_hash = hashlib.sha256(raw).hexdigest()
+    codec = "zstd" if zstandard else "gzip"
+    path = archive_blob_path(archive_dir, content_hash, codec)
+    if os.path.exists(path):
+        compressed_size = os.path.getsize(path)
+    else:
+        # Identical pages share one blob; write to a temp file first so a crash never leaves a partial blob
+        blob = zstandard.ZstdCompressor(level=10).compress(raw) if codec == "zstd" else gzip.compress(raw, 6)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(blob)
+        os.replace(tmp_path, path)
+        compressed_size = len(blob)
+    conn.execute(
+        'INSERT OR REPLACE INTO pages (url, content_hash, codec, size, compressed_size, fetched_at) VALUES (?, ?, ?, ?, ?, ?)',
+        (url, content_hash, codec, len(raw), compressed_size, datetime.now(timezone.utc).isoformat())
+    )
+
+def read_archived_page(path):
+    with open(path, 'rb') as f:
+        blob = f.read()
+    if path.endswith(".zst"):
+        if zstandard is None:
+            raise RuntimeError("zstandard is required to read .zst archive blobs")
+        return zstandard.ZstdDecompressor().decompress(blob).decode('utf-8')
+    return gzip.decompress(blob).decode('utf-8')
+
+def fingerprint_archived_page(path):
+    # Runs in a worker process during reparse
+    try:
+        return page_fingerprint(read_archived_page(path))
+    except Exception as e:
+        print(f"Failed to read archived page {path}: {e}")
+        return None
+
+def parse_archived_page(path):
+    # Runs in a worker process during reparse
+    try:
+        return parse_page(read_archived_page(path))
+    except Exception as e:
+        print(f"Failed to parse archived page {path}: {e}")
+        return None
+
 def parse_page(html_content):
     soup = BeautifulSoup(html_content, 'html.parser')
 
@@ -108,11 +310,9 @@ def parse_page(html_content):
 
     return data
 
-def save_data_to_db(db_path, data_list):
-    conn = sqlite3.connect(db_path)
-    c = conn.cursor()
-    c.execute('''
-        CREATE TABLE IF NOT EXISTS extracted_data (
+def create_data_table(c, table='extracted_data'):
+    c.execute(f'''
+        CREATE TABLE IF NOT EXISTS {table} (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             course_id TEXT,
             course_code TEXT UNIQUE,
@@ -125,15 +325,25 @@ def save_data_to_db(db_path, data_list):
             description TEXT,
             topics TEXT,
             prerequisites TEXT,
-            course_type TEXT
+            course_type TEXT,
+            url TEXT,
+            alias_urls TEXT
         )
     ''')
+    # Databases created before URLs were tracked get the new columns added in place
+    existing_columns = [col[1] for col in c.execute(f'PRAGMA table_info({table})')]
+    for column in ('url', 'alias_urls'):
+        if column not in existing_columns:
+            c.execute(f'ALTER TABLE {table} ADD COLUMN {column} TEXT')
+
+def insert_data_rows(c, data_list, table='extracted_data'):
     for data in data_list:
         try:
-            c.execute('''
-                INSERT OR REPLACE INTO extracted_data (
-                    course_id, course_code, title, semester, credits, campus, school, career, description, topics, prerequisites, course_type
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            c.execute(f'''
+                INSERT OR REPLACE INTO {table} (
+                    course_id, course_code, title, semester, credits, campus, school, career, description, topics, prerequisites, course_type,
+                    url, alias_urls
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
             ''', (
                 data.get('course_id', ''),
                 data.get('course_code', ''),
@@ -146,14 +356,45 @@ def save_data_to_db(db_path, data_list):
                 data.get('description', ''),
                 json.dumps(data.get('topics', [])),
                 json.dumps(data.get('prerequisites', [])),
-                data.get('course_type', '')
+                data.get('course_type', ''),
+                data.get('url', ''),
+                json.dumps(data.get('alias_urls', []))
             ))
         except sqlite3.Error as e:
             print(f"Failed to insert data for course_code {data.get('course_code', '')}: {e}")
-    conn.commit()
-    conn.close()
 
-def run_extraction_with_filters(filter_keywords):
+def save_data_to_db(db_path, data_list, replace_all=False):
+    """Insert or update records in extracted_data.
+
+    With ``replace_all`` the table is rebuilt from ``data_list`` only: the rows go into a staging
+    table that is swapped in within a single transaction, so a failure leaves the old table intact.
+    """
+    conn = sqlite3.connect(db_path)
+    c = conn.cursor()
+    if not replace_all:
+        create_data_table(c)
+        insert_data_rows(c, data_list)
+        conn.commit()
+        conn.close()
+        return
+
+    # Manage the transaction explicitly; sqlite3 would otherwise run the DDL below in autocommit mode
+    conn.isolation_level = None
+    try:
+        c.execute('BEGIN')
+        c.execute('DROP TABLE IF EXISTS extracted_data_new')
+        create_data_table(c, 'extracted_data_new')
+        insert_data_rows(c, data_list, 'extracted_data_new')
+        c.execute('DROP TABLE IF EXISTS extracted_data')
+        c.execute('ALTER TABLE extracted_data_new RENAME TO extracted_data')
+        c.execute('COMMIT')
+    except Exception:
+        c.execute('ROLLBACK')
+        raise
+    finally:
+        conn.close()
+
+def run_extraction_with_filters(filter_keywords, archive_dir=ARCHIVE_DIR):
     sitemap_url = "https://www.rmit.edu.au/sitemap.xml"
     print(f"Downloading sitemap from {sitemap_url}...")
     sitemap_xml = download_sitemap(sitemap_url)
@@ -164,21 +405,126 @@ def run_extraction_with_filters(filter_keywords):
     # Filter URLs based on user-selected keywords
     filtered_urls = [url for url in urls if any(keyword in url for keyword in filter_keywords)]
 
+    # Tracking and query-string variants of the same URL are only downloaded once
+    dedup = PageDeduplicator()
+    unique_urls = {}
+    for url in filtered_urls:
+        unique_urls.setdefault(canonicalize_url(url), []).append(url)
+    print(f"{len(unique_urls)} unique URLs after removing {len(filtered_urls) - len(unique_urls)} URL variants.")
+
     data_list = []
+    skipped = 0
+    archive_conn = open_archive_index(archive_dir) if archive_dir else None
 
-    for i, url in enumerate(filtered_urls, start=1):
-        print(f"Processing ({i}/{len(filtered_urls)}): {url}")
+    for i, variants in enumerate(unique_urls.values(), start=1):
+        url = variants[0]
+        print(f"Processing ({i}/{len(unique_urls)}): {url}")
         page_html = download_page(url)
         if page_html:
+            # Keep the raw HTML so the table can be rebuilt later with --reparse
+            if archive_conn:
+                for variant in variants:
+                    archive_page(archive_conn, archive_dir, variant, page_html)
+                if i % 50 == 0:
+                    archive_conn.commit()
+            # Campus/intake variants of a page already seen are recorded as aliases and not parsed again
+            canonical = dedup.find_duplicate(url, page_fingerprint(page_html))
+            for variant in variants:
+                dedup.add_alias(canonical or url, variant)
+            if canonical:
+                skipped += 1
+                continue
             data = parse_page(page_html)
+            data["url"] = url
             data_list.append(data)
 
+    if archive_conn:
+        archive_conn.commit()
+        archive_conn.close()
+
+    for data in data_list:
+        data["alias_urls"] = dedup.aliases.get(data["url"], [])
+    data_list = merge_records_by_code(data_list)
+    print(f"Skipped {skipped} duplicate pages.")
+
     output_db = "extracted_data.db"
     save_data_to_db(output_db, data_list)
     print(f"Extraction complete. Data saved in database file '{output_db}'.")
 
+def run_reparse(archive_dir=ARCHIVE_DIR, output_db="extracted_data.db", workers=None, replace=False):
+    """Re-parse the page archive into the extracted_data table without any network access.
+
+    Records are merged into the existing table by course code. Only with ``replace`` are rows
+    that are not in the archive (crawled with --no-archive or before archiving existed) dropped.
+    """
+    index_path = os.path.join(archive_dir, ARCHIVE_INDEX)
+    if not os.path.exists(index_path):
+        print(f"No page archive found at '{archive_dir}'. Run a crawl first.")
+        return
+    conn = sqlite3.connect(index_path)
+    rows = conn.execute('SELECT url, content_hash, codec FROM pages ORDER BY rowid').fetchall()
+    conn.close()
+    if not rows:
+        print(f"The page archive at '{archive_dir}' is empty. Nothing to re-parse.")
+        return
+
+    # Each blob is parsed once even if several URLs point at it; the first URL is canonical
+    blobs = {}
+    for url, content_hash, codec in rows:
+        blobs.setdefault((content_hash, codec), []).append(url)
+    paths = [archive_blob_path(archive_dir, content_hash, codec) for content_hash, codec in blobs]
+    blob_urls = list(blobs.values())
+
+    data_list = []
+    dedup = PageDeduplicator()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # Fingerprint first so near-duplicate pages are never parsed
+        to_parse = []
+        for (path, urls), fp in zip(zip(paths, blob_urls), executor.map(fingerprint_archived_page, paths, chunksize=16)):
+            if fp is None:
+                continue
+            canonical = dedup.find_duplicate(urls[0], fp)
+            for url in urls:
+                dedup.add_alias(canonical or urls[0], url)
+            if canonical is None:
+                to_parse.append((path, urls[0]))
+        print(f"Re-parsing {len(to_parse)} archived pages from '{archive_dir}' "
+              f"({len(paths) - len(to_parse)} duplicates skipped)...")
+
+        parsed = executor.map(parse_archived_page, [path for path, _ in to_parse], chunksize=16)
+        for i, ((_, url), data) in enumerate(zip(to_parse, parsed), start=1):
+            if data:
+                data["url"] = url
+                data["alias_urls"] = dedup.aliases.get(url, [])
+                data_list.append(data)
+            if i % 100 == 0:
+                print(f"Parsed {i}/{len(to_parse)} pages")
+
+    data_list = merge_records_by_code(data_list)
+    if not data_list:
+        print("No records could be parsed from the archive. The database was left unchanged.")
+        return
+
+    save_data_to_db(output_db, data_list, replace_all=replace)
+    mode = "replaced the table" if replace else "merged by course code"
+    print(f"Re-parse complete. {len(data_list)} records saved in database file '{output_db}' ({mode}).")
+
 def main():
-    # Default main function calls extraction with default filters
+    parser = argparse.ArgumentParser(description="Extract RMIT course data into extracted_data.db")
+    parser.add_argument("--reparse", action="store_true",
+                        help="rebuild the database from the local page archive instead of crawling")
+    parser.add_argument("--archive-dir", default=ARCHIVE_DIR, help="directory of the raw page archive")
+    parser.add_argument("--no-archive", action="store_true", help="do not archive fetched pages")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes for --reparse")
+    parser.add_argument("--replace", action="store_true",
+                        help="with --reparse, drop rows that are not in the archive instead of merging")
+    args = parser.parse_args()
+
+    if args.reparse:
+        run_reparse(args.archive_dir, workers=args.workers, replace=args.replace)
+        return
+
+    # Default extraction with default filters
     default_filters = [
         "apprenticeship",
         "traineeship",
@@ -188,7 +534,7 @@ def main():
         "postgraduate-degree",
         "levels-of-study"
     ]
-    run_extraction_with_filters(default_filters)
+    run_extraction_with_filters(default_filters, archive_dir=None if args.no_archive else args.archive_dir)
 
 if __name__ == "__main__":
     main()
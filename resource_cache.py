@@ -0,0 +1,81 @@
+import threading
+import time
+
+# Process-wide cache for resources that are slow to create (AWS credentials, clients, catalogs).
+# Lives in its own module so it survives Streamlit re-running app.py on every interaction.
+_values = {}
+_locks = {}
+_locks_guard = threading.Lock()
+
+
+def _key_lock(key):
+    with _locks_guard:
+        return _locks.setdefault(key, threading.Lock())
+
+
+def _evict_expired(now):
+    """Drop expired entries (e.g. clients for refreshed credentials) and their locks so neither piles up"""
+    for key, (_, expires) in list(_values.items()):
+        if expires is not None and expires <= now:
+            _values.pop(key, None)
+            with _locks_guard:
+                lock = _locks.get(key)
+                # A held lock means another caller is recreating this key right now
+                if lock is not None and not lock.locked():
+                    del _locks[key]
+
+
+def get_or_create(key, factory, ttl=None):
+    """Return the cached value for ``key``, calling ``factory`` once to create it.
+
+    Concurrent callers wait for an in-flight creation (for example a background prefetch)
+    instead of creating the resource twice. Values older than ``ttl`` seconds are recreated.
+    """
+    entry = _values.get(key)
+    if entry and (entry[1] is None or entry[1] > time.monotonic()):
+        return entry[0]
+    with _key_lock(key):
+        entry = _values.get(key)
+        if entry and (entry[1] is None or entry[1] > time.monotonic()):
+            return entry[0]
+        value = factory()
+        put(key, value, ttl)
+        return value
+
+
+def put(key, value, ttl=None):
+    """Store ``value`` under ``key``, replacing any cached value"""
+    now = time.monotonic()
+    _evict_expired(now)
+    _values[key] = (value, now + ttl if ttl else None)
+
+
+def clear():
+    """Drop every cached value, e.g. between load-test levels"""
+    _values.clear()
+
+
+def peek(key):
+    """Return the cached value for ``key`` without creating it, or None"""
+    entry = _values.get(key)
+    if entry and (entry[1] is None or entry[1] > time.monotonic()):
+        return entry[0]
+    return None
+
+
+def prefetch(factory, name=None):
+    """Call ``factory`` on a daemon thread so the get_or_create calls inside it are warm when needed.
+
+    The factory does its own caching; nothing is cached under a separate prefetch key, so a
+    later prefetch for another user (or after a TTL expires) runs again.
+    """
+    def run():
+        try:
+            factory()
+        except Exception as e:
+            # The foreground call will retry and surface the error to the user
+            print(f"Prefetch of {name or getattr(factory, '__name__', 'resource')} failed: {e}")
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,367 @@
+import re
+from graphlib import TopologicalSorter, CycleError
+
+# Default catalog files bundled with the app
+COURSES_FILE = "courses_data.json"
+STRUCTURE_FILE = "cyber_security_program_structure.json"
+
+# Standard full-time load (4 x 12 credit points per semester)
+MAX_COURSES_PER_SEMESTER = 4
+
+# Lower rank is scheduled first when several courses compete for a semester
+COURSE_TYPE_RANK = {"core": 0, "capstone": 1, "minor": 2, "elective": 3}
+
+MINOR_SLOT_TITLE = "Major/Minor Course"
+
+YEAR_WORDS = {"first": 1, "second": 2, "third": 3, "fourth": 4, "final": None}
+SEMESTER_WORDS = {"first": 1, "second": 2}
+COURSE_CODE_PATTERN = re.compile(r"\b[A-Z]{4}\d{4}\b", re.I)
+COMPLETED_PATTERN = re.compile(r"\b(?:completed|finished|passed|done|already (?:did|took|taken))\b", re.I)
+COURSE_WORDS = r"(?:courses?|subjects?|units?|classes)"
+STUDY_VERBS = r"(?:take|study|enrol|enroll|do|choose|pick)"
+# Only questions that explicitly ask what to take (or for a plan) are answered by the planner
+PLAN_INTENT_PATTERN = re.compile(
+    r"\b(?:study|course|semester|my)\s+plan\b|\bplan\s+(?:my|out)\b"
+    rf"|\bwhat\s+(?:should|do|can|must|will)\s+(?:i|we|\w+[\s-]years?)\s+{STUDY_VERBS}\b"
+    rf"|\bwhat\s+to\s+{STUDY_VERBS}\b"
+    rf"|\b(?:what|which)\s+(?:\w+\s+){{0,2}}{COURSE_WORDS}\s+(?:should|do|can|must|to|are|in|for|next)\b"
+    rf"|\b{COURSE_WORDS}\s+(?:for|in)\s+(?:the\s+)?(?:\d|first|second|third|fourth|final|year|sem)",
+    re.I,
+)
+# Questions about anything other than which courses to take go to the model
+OTHER_TOPIC_PATTERN = re.compile(
+    r"\b(?:prereq\w*|requisites?|cover\w*|differen\w*|compare|versus|vs|credit\w*|points?|worth|part[\s-]?time"
+    r"|full[\s-]?time|fees?|cost\w*|assess\w*|exams?|career\w*|jobs?|online|campus|timetable|about|learn\w*"
+    r"|teach\w*|topics?|content|hard\w*|eas(?:y|ier|iest)|difficult\w*|best|popular|workload|why|how)\b",
+    re.I,
+)
+INTEREST_PATTERN = re.compile(r"\b(?:interest\w*|passionate|keen|into|like|love|enjoy|focus\w*|want|specialis\w*|specializ\w*)\b", re.I)
+
+
+def normalize_title(title):
+    """Lower-case a course title and strip punctuation so catalog and structure titles line up"""
+    title = (title or "").lower().replace("&", " and ")
+    return " ".join(re.findall(r"[a-z0-9]+", title))
+
+
+def parse_offered_semesters(semester_text):
+    """Map a catalog semester field ("Sem 1 2025", "UGRDFlex24") to the semesters it runs in"""
+    text = str(semester_text or "")
+    found = {int(s) for s in re.findall(r"\b(?:sem(?:ester)?)\s*([12])\b", text, re.I)}
+    # Flexible or unknown offerings are treated as available in both semesters
+    return found or {1, 2}
+
+
+def parse_year_key(key):
+    """Turn a structure key like "year_2" into 2"""
+    match = re.search(r"(\d+)", str(key))
+    return int(match.group(1)) if match else None
+
+
+def program_years(structure, program_code=None):
+    """Number of years in the selected program (BP355 is 3 years, BP356 is 4)"""
+    programs = (structure or {}).get("programs", [])
+    for program in programs:
+        if program_code is None or program.get("code", "").upper() == program_code.upper():
+            match = re.search(r"(\d+)", str(program.get("duration", "")))
+            if match:
+                return int(match.group(1))
+    years = [parse_year_key(k) for k in (structure or {}).get("recommended_courses", {})]
+    years = [y for y in years if y]
+    return max(years) if years else 3
+
+
+def build_catalog(courses, structure=None):
+    """Build the prerequisite/offering graph from the course list and program structure.
+
+    Returns a dict with "nodes" (keyed by course code, or by title for structure entries
+    that are missing from the course list), "slots" (Major/Minor placeholders per year),
+    "minors" and the raw structure.
+    """
+    nodes = {}
+    by_title = {}
+
+    for course in courses or []:
+        code = (course.get("course_code") or "").strip().upper()
+        title = course.get("title", "Untitled")
+        key = code if code and code != "N/A" else title
+        minor = course.get("minor_track") or []
+        if isinstance(minor, str):
+            minor = [minor]
+        nodes[key] = {
+            "key": key,
+            "code": code or "N/A",
+            "title": title,
+            "course_type": (course.get("course_type") or "elective").lower(),
+            "semesters": parse_offered_semesters(course.get("semester")),
+            "prerequisites": list(course.get("prerequisites") or []),
+            "minor_track": list(minor),
+            "year": None,
+        }
+        by_title[normalize_title(title)] = key
+
+    slots = {}
+    recommended = (structure or {}).get("recommended_courses", {}) if isinstance(structure, dict) else {}
+    for year_key, titles in recommended.items():
+        year = parse_year_key(year_key)
+        if year is None:
+            continue
+        for title in titles:
+            if normalize_title(title) == normalize_title(MINOR_SLOT_TITLE):
+                slots[year] = slots.get(year, 0) + 1
+                continue
+            key = match_title(title, by_title)
+            if key is None:
+                # Listed in the structure but not in the course list; keep it so the plan stays complete
+                key = title
+                nodes[key] = {
+                    "key": key,
+                    "code": "N/A",
+                    "title": title,
+                    "course_type": "core",
+                    "semesters": {1, 2},
+                    "prerequisites": [],
+                    "minor_track": [],
+                    "year": None,
+                }
+                by_title[normalize_title(title)] = key
+            if nodes[key]["year"] is None or year < nodes[key]["year"]:
+                nodes[key]["year"] = year
+
+    # Resolve prerequisites given as codes or titles into node keys
+    for node in nodes.values():
+        resolved = []
+        for prereq in node["prerequisites"]:
+            prereq_code = str(prereq).strip().upper()
+            if prereq_code in nodes:
+                resolved.append(prereq_code)
+            else:
+                key = match_title(str(prereq), by_title)
+                if key is not None:
+                    resolved.append(key)
+        node["prerequisites"] = resolved
+
+    minors = (structure or {}).get("minors", []) if isinstance(structure, dict) else []
+    return {"nodes": nodes, "slots": slots, "minors": minors, "structure": structure or {}}
+
+
+def match_title(title, by_title):
+    """Find the catalog key for a structure title, allowing "X" to match "X for IT" style variants"""
+    wanted = normalize_title(title)
+    if wanted in by_title:
+        return by_title[wanted]
+    wanted_words = set(wanted.split())
+    best = None
+    for candidate, key in by_title.items():
+        candidate_words = set(candidate.split())
+        if len(candidate_words) < 2 or len(wanted_words) < 2:
+            continue
+        if candidate_words <= wanted_words or wanted_words <= candidate_words:
+            overlap = len(candidate_words & wanted_words)
+            if best is None or overlap > best[0]:
+                best = (overlap, key)
+    return best[1] if best else None
+
+
+def topological_rank(nodes):
+    """Order courses so prerequisites come first; courses caught in a prerequisite cycle are returned separately"""
+    graph = {key: [p for p in node["prerequisites"] if p in nodes] for key, node in nodes.items()}
+    cyclic = set()
+    while True:
+        try:
+            order = list(TopologicalSorter(graph).static_order())
+            return {key: i for i, key in enumerate(order)}, cyclic
+        except CycleError as e:
+            # Drop the reported cycle and retry; anything in it can never be scheduled
+            cycle = set(e.args[1])
+            cyclic |= cycle
+            graph = {k: [p for p in deps if p not in cycle] for k, deps in graph.items() if k not in cycle}
+
+
+def plan_study(catalog, year, semester=None, completed=(), minor=None, program=None,
+               max_load=MAX_COURSES_PER_SEMESTER):
+    """Compute a semester-by-semester plan from the given year/semester to the end of the program.
+
+    Courses recommended for an earlier year are assumed done, together with ``completed``.
+    When planning from semester 2, the year's semester 1 is scheduled first and its courses are
+    assumed done. Major/Minor slots are filled from the chosen minor track, then from electives.
+    Core and capstone courses left unscheduled are listed under "infeasible".
+    """
+    nodes = catalog["nodes"]
+    semester = semester or 1
+    last_year = program_years(catalog["structure"], program)
+    completed_keys = {resolve_key(catalog, c) for c in completed}
+    completed_keys.discard(None)
+    completed_keys.update(k for k, n in nodes.items() if n["year"] is not None and n["year"] < year)
+
+    remaining = {k: dict(n) for k, n in nodes.items()
+                 if n["year"] is not None and n["year"] <= last_year and k not in completed_keys}
+
+    # Fill Major/Minor slots for the years still ahead, from the minor track first
+    pool = [n for n in nodes.values()
+            if minor and on_minor_track(n, minor) and n["key"] not in completed_keys and n["key"] not in remaining]
+    pool += [n for n in nodes.values()
+             if n["year"] is None and n["key"] not in completed_keys and n not in pool
+             and n["course_type"] in ("elective", "minor")]
+    placeholders = 0
+    for slot_year in sorted(catalog["slots"]):
+        if slot_year < year or slot_year > last_year:
+            continue
+        for _ in range(catalog["slots"][slot_year]):
+            if pool:
+                picked = dict(pool.pop(0))
+                picked["year"] = slot_year
+                remaining[picked["key"]] = picked
+            else:
+                placeholders += 1
+                key = f"{MINOR_SLOT_TITLE} #{placeholders}"
+                remaining[key] = {
+                    "key": key, "code": "N/A", "title": MINOR_SLOT_TITLE,
+                    "course_type": "minor", "semesters": {1, 2}, "prerequisites": [],
+                    "minor_track": [minor] if minor else [], "year": slot_year, "placeholder": True,
+                }
+
+    rank, cyclic = topological_rank(remaining)
+    done = set(completed_keys)
+    terms = []
+    # A semester-2 plan still has to account for the year's semester-1 share of the load
+    current_year, current_semester = year, 1
+    while current_year <= last_year and remaining:
+        candidates = [
+            n for k, n in remaining.items()
+            if k not in cyclic
+            and n["year"] <= current_year
+            and current_semester in n["semesters"]
+            and all(p in done for p in n["prerequisites"])
+        ]
+        # Courses with fewer offerings go first; open Major/Minor placeholders only fill what is left
+        candidates.sort(key=lambda n: (n["year"], n.get("placeholder", False), len(n["semesters"]),
+                                       COURSE_TYPE_RANK.get(n["course_type"], 4),
+                                       rank.get(n["key"], 0), n["code"], n["title"]))
+        taken = candidates[:max_load]
+        for node in taken:
+            del remaining[node["key"]]
+        # Courses taken this semester only unlock prerequisites from the next semester on
+        done.update(node["key"] for node in taken)
+        terms.append({"year": current_year, "semester": current_semester, "courses": taken})
+        current_year, current_semester = (current_year, 2) if current_semester == 1 else (current_year + 1, 1)
+
+    if semester == 2 and terms:
+        completed_keys.update(node["key"] for node in terms.pop(0)["courses"])
+
+    unscheduled = sorted(remaining.values(), key=lambda n: (n["year"], n["title"]))
+    return {
+        "year": year,
+        "semester": semester,
+        "minor": minor,
+        "program": program,
+        "completed": sorted(completed_keys),
+        "terms": terms,
+        "unscheduled": unscheduled,
+        "infeasible": [n for n in unscheduled if n["course_type"] in ("core", "capstone")],
+    }
+
+
+def on_minor_track(node, minor):
+    """Whether a course belongs to the named minor (listed on its track, or the minor's namesake course)"""
+    wanted = minor.lower()
+    return (any(m.lower() == wanted for m in node["minor_track"])
+            or normalize_title(node["title"]) == normalize_title(minor))
+
+
+def resolve_key(catalog, code_or_title):
+    nodes = catalog["nodes"]
+    key = str(code_or_title).strip().upper()
+    if key in nodes:
+        return key
+    by_title = {normalize_title(n["title"]): k for k, n in nodes.items()}
+    return match_title(str(code_or_title), by_title)
+
+
+def parse_plan_question(question, catalog=None):
+    """Pull year, semester, completed courses and minor out of a study-plan question.
+
+    Returns None unless the question explicitly asks what to take (or for a plan) and has no other
+    content such as topics, prerequisites or interests that don't name a minor, so it can go to the model.
+    """
+    text = question or ""
+    year = None
+    match = (re.search(r"\by(?:ea)?r\s*([1-4])\b", text, re.I)
+             or re.search(r"\b([1-4])(?:st|nd|rd|th)[\s-]*years?\b", text, re.I)
+             or re.search(r"\bs[12]\s*y([1-4])\b", text, re.I))
+    if match:
+        year = int(match.group(1))
+    else:
+        match = re.search(r"\b(first|second|third|fourth)[\s-]*years?\b", text, re.I)
+        if match:
+            year = YEAR_WORDS[match.group(1).lower()]
+
+    semester = None
+    match = (re.search(r"\bsem(?:ester)?\s*([12])\b", text, re.I)
+             or re.search(r"\bs([12])\s*y[1-4]\b", text, re.I))
+    if match:
+        semester = int(match.group(1))
+    else:
+        match = re.search(r"\b(first|second)\s+sem(?:ester)?\b", text, re.I)
+        if match:
+            semester = SEMESTER_WORDS[match.group(1).lower()]
+
+    if year is None or not PLAN_INTENT_PATTERN.search(text) or OTHER_TOPIC_PATTERN.search(text):
+        return None
+
+    completed = []
+    match = COMPLETED_PATTERN.search(text)
+    if match:
+        completed = [c.upper() for c in COURSE_CODE_PATTERN.findall(text[match.start():])]
+
+    minor = None
+    minors = catalog["minors"] if catalog else []
+    for name in sorted(minors, key=len, reverse=True):
+        if re.search(r"\b" + re.escape(name) + r"\b", text, re.I):
+            minor = name
+            break
+    # Interests the planner can't act on (topics rather than a minor track) need the model
+    if minor is None and INTEREST_PATTERN.search(text):
+        return None
+
+    program = "BP356" if re.search(r"\bBP356\b|\bprofessional\b", text, re.I) else None
+
+    return {"year": year, "semester": semester, "completed": completed, "minor": minor, "program": program}
+
+
+def format_course(node):
+    code = f" ({node['code']})" if node["code"] != "N/A" else ""
+    return f"- {node['title']}{code} — {node['course_type']}"
+
+
+def format_plan(plan):
+    """Render a computed plan as Markdown"""
+    lines = []
+    if plan.get("infeasible"):
+        titles = ", ".join(n["title"] for n in plan["infeasible"])
+        lines.append(f"**⚠️ This plan is not feasible:** required courses could not be fitted in before the end "
+                     f"of the program ({titles}). Please check your completed courses with your program manager.\n")
+    if plan["minor"]:
+        lines.append(f"**Minor:** {plan['minor']}\n")
+    for term in plan["terms"]:
+        lines.append(f"**Year {term['year']}, Semester {term['semester']}**")
+        if term["courses"]:
+            lines.extend(format_course(n) for n in term["courses"])
+        else:
+            lines.append("- No eligible courses this semester")
+        lines.append("")
+    if plan["unscheduled"]:
+        lines.append("**Could not be scheduled** (no free place in a semester it runs, or prerequisites not met):")
+        lines.extend(format_course(n) for n in plan["unscheduled"])
+    return "\n".join(lines).strip()
+
+
+def build_plan_prompt(plan, user_question):
+    """Short prompt asking the model only to explain an already computed plan"""
+    return (
+        "You are a helpful assistant for the RMIT Bachelor of Cyber Security (BP355/BP356). "
+        "The study plan below was computed from the official program structure, course offerings "
+        "and prerequisites. Explain it to the student in plain words. Do not add, remove or move courses.\n\n"
+        "### Study Plan\n" + format_plan(plan)
+        + "\n\nUser:\n" + user_question
+    )
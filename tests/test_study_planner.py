@@ -0,0 +1,98 @@
+import json
+import os
+import sys
+
+import pytest
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_DIR)
+
+import study_planner
+
+
+@pytest.fixture(scope="module")
+def catalog():
+    with open(os.path.join(PROJECT_DIR, study_planner.COURSES_FILE), encoding="utf-8") as f:
+        courses = json.load(f)
+    with open(os.path.join(PROJECT_DIR, study_planner.STRUCTURE_FILE), encoding="utf-8") as f:
+        structure = json.load(f)
+    return study_planner.build_catalog(courses, structure)
+
+
+@pytest.mark.parametrize("question, year, semester", [
+    ("What should I take in year 2 semester 1?", 2, 1),
+    ("cyber courses for 2nd year", 2, None),
+    ("what do second years take in cyber security", 2, None),
+    ("I am a 2nd year student, what courses in sem 2?", 2, 2),
+    ("Which courses should I take in year 1?", 1, None),
+    ("Plan my study for year 3", 3, None),
+    ("what to take in first year semester 2", 1, 2),
+])
+def test_plan_questions_are_parsed(catalog, question, year, semester):
+    query = study_planner.parse_plan_question(question, catalog)
+    assert query is not None
+    assert (query["year"], query["semester"]) == (year, semester)
+
+
+def test_plan_question_details(catalog):
+    query = study_planner.parse_plan_question(
+        "I'm interested in the Cloud Computing minor and have completed COSC1111, what should I take in year 2?",
+        catalog,
+    )
+    assert query["minor"] == "Cloud Computing"
+    assert query["completed"] == ["COSC1111"]
+
+
+@pytest.mark.parametrize("question", [
+    "Which year 2 courses cover cryptography?",
+    "What are the prerequisites for year 3 courses?",
+    "How many credit points is a year 1 course worth?",
+    "Can I study year 2 part-time?",
+    "I'm a second-year student interested in digital forensics and blockchain. What courses should I take?",
+    "What's the difference between the year 2 courses COSC2626 and INTE2402?",
+    "Should I take COSC2626 in year 2?",
+    "Which year 3 courses are hardest?",
+    "What should I take?",
+])
+def test_other_questions_go_to_the_model(catalog, question):
+    assert study_planner.parse_plan_question(question, catalog) is None
+
+
+def plan_terms(plan):
+    return {(t["year"], t["semester"]): [n["key"] for n in t["courses"]] for t in plan["terms"]}
+
+
+def test_semester_only_courses_are_scheduled_first(catalog):
+    terms = plan_terms(study_planner.plan_study(catalog, 1, 1))
+    # Programming Bootcamp 1 only runs in semester 1, so it must not be pushed into year 2
+    assert "COSC2801" in terms[(1, 1)]
+    assert len(terms[(1, 2)]) == 3
+
+
+def test_semester_two_plan_assumes_the_years_semester_one_share(catalog):
+    plan = study_planner.plan_study(catalog, 1, 2)
+    terms = plan_terms(plan)
+    assert min(terms) == (1, 2)
+    year_one = {k for k, n in catalog["nodes"].items() if n["year"] == 1}
+    assert year_one <= set(plan["completed"]) | set(terms[(1, 2)])
+    assert not plan["infeasible"]
+
+
+def test_second_year_semester_two_schedules_all_core_courses(catalog):
+    plan = study_planner.plan_study(catalog, 2, 2)
+    assert not plan["infeasible"]
+    assert "INTE2402" in plan["completed"]
+
+
+def test_minor_track_course_fills_the_minor_slot(catalog):
+    plan = study_planner.plan_study(catalog, 2, 1, minor="Cloud Computing")
+    terms = plan_terms(plan)
+    assert "COSC2626" in terms[(2, 1)]
+    assert not plan["unscheduled"]
+
+
+def test_placeholders_yield_to_real_courses(catalog):
+    plan = study_planner.plan_study(catalog, 3, 1)
+    terms = plan_terms(plan)
+    assert "COSC2626" in terms[(3, 1)]
+    assert not any(n["key"] == "COSC2626" for n in plan["unscheduled"])